@@ -9,6 +9,10 @@ TEMPLATE_FILE = "demo.txt"
 LATENCY_THRESHOLD = 500
 # 异步并发数（根据服务器性能调整）
 CONCURRENT_LIMIT = 20
+# 同一主机最大并发测速数（避免单个慢速源占满并发，0为不限制）
+PER_HOST_LIMIT = 4
+# 直播源抓取并发数
+FETCH_CONCURRENT_LIMIT = 8
 # 超时时间（s）
 TIMEOUT = 12
 # 重试次数
@@ -1,20 +1,47 @@
 import re
+import sys
+import codecs
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 import asyncio
 import aiohttp
 import time
-from collections import OrderedDict
+import json
+from collections import OrderedDict, defaultdict, deque
+from itertools import zip_longest
+from operator import attrgetter
 from datetime import datetime
 import config
 import os
 import difflib
 from pathlib import Path
+from urllib.parse import urlparse
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple, Set
 from functools import lru_cache
 import warnings
 
+try:
+    import ahocorasick  # 可选：pyahocorasick，加速频道分类关键词匹配
+except ImportError:
+    ahocorasick = None
+
+try:
+    import aiodns  # 可选：为aiohttp提供异步DNS解析
+except ImportError:
+    aiodns = None
+
+try:
+    from rapidfuzz import fuzz, process as fuzz_process  # 可选：加速频道名模糊匹配
+except ImportError:
+    fuzz = fuzz_process = None
+
+try:
+    import numpy  # 可选：配合rapidfuzz批量计算匹配得分矩阵
+except ImportError:
+    numpy = None
+
 # ===================== 基础配置与全局设置 =====================
 # 屏蔽SSL不安全请求警告
 warnings.filterwarnings('ignore', category=requests.packages.urllib3.exceptions.InsecureRequestWarning)
@@ -32,6 +59,7 @@ CONFIG_DEFAULTS = {
     # 测速配置
     "LATENCY_THRESHOLD": 500,
     "CONCURRENT_LIMIT": 20,
+    "PER_HOST_LIMIT": 4,
     "TIMEOUT": 10,
     "RETRY_TIMES": 2,
     "IP_VERSION_PRIORITY": "ipv4",
@@ -45,6 +73,7 @@ CONFIG_DEFAULTS = {
     "EPG_URLS": [],
     "ANNOUNCEMENTS": [],
     "SOURCE_URLS": [],
+    "FETCH_CONCURRENT_LIMIT": 8,
     # 进度配置
     "PROGRESS_INTERVAL": 50
 }
@@ -64,15 +93,82 @@ PROXY_PREFIXES = [
     "https://gh.api.99988866.xyz/"
 ]
 
+# 频道分类关键词（按优先级排列，靠前的分类优先命中）
+TEXT_CATEGORY_RULES = [
+    ("央视频道", ['CCTV', '央视', '中央']),
+    ("卫视频道", ['卫视', '江苏', '浙江', '湖南', '东方']),
+    ("电影频道", ['电影', '影视']),
+    ("体育频道", ['体育', 'CCTV5']),
+]
+URL_CATEGORY_RULES = [
+    ("央视频道", ['CCTV', '央视']),
+    ("卫视频道", ['卫视']),
+]
+
+# 预编译正则（热点路径复用，避免每次调用重复解析）
+RESOLUTION_PATTERN = re.compile(rb"RESOLUTION=(\d+x\d+)")
+# 频道名标准化
+CCTV5_PLUS_PATTERN = re.compile(r'CCTV-?5\+')
+SECOND_SET_PATTERN = re.compile(r'(\w+)二套(\w+)')
+THIRD_SET_PATTERN = re.compile(r'(\w+)三套(\w+)')
+NAME_STRIP_PATTERN = re.compile(r'[$「」()（）\s-]')
+DIGIT_RUN_PATTERN = re.compile(r'\d+')
+# 频道名简化（模糊匹配前去除通用后缀）
+NAME_SIMPLIFY_PATTERN = re.compile(r'卫视|频道|综合|台')
+# 分类名标准化
+GROUP_PURE_TEXT_PATTERN = re.compile(r'[\u4e00-\u9fa5a-zA-Z0-9]+')
+GROUP_KEEP_CHARS_PATTERN = re.compile(r'[\u4e00-\u9fa5a-zA-Z0-9_\(\)]+')
+# 直播源内容提取
+M3U_ENTRY_PATTERN = re.compile(
+    r"(#EXTINF:-?\d+.*?)\n\s*([^#\n\r\s].*?)(?=\s|#|$)",
+    re.IGNORECASE | re.DOTALL | re.MULTILINE
+)
+M3U_ATTR_PATTERN = re.compile(r'(\w+)-(\w+)="([^"]*)"')
+M3U_NAME_PATTERN = re.compile(r',\s*(.+?)\s*$')
+TEXT_GROUP_PATTERN = re.compile(r'[：:=](\S+)')
+TEXT_GROUP_STRIP_PATTERN = re.compile(r'[#分类:genre:==\-—]')
+TEXT_CHANNEL_PATTERN = re.compile(r'([^,|#$]+)[,|#$]\s*(https?://[^\s,|#$]+)', re.IGNORECASE)
+BARE_URL_PATTERN = re.compile(r'(https?://[^\s]+)', re.IGNORECASE | re.MULTILINE)
+
+# URL黑名单（统一转小写，合并为单个正则一次扫描）
+URL_BLACKLIST_KEYWORDS = [
+    kw.lower().strip()
+    for kw in getattr(config, 'URL_BLACKLIST', CONFIG_DEFAULTS["URL_BLACKLIST"])
+    if kw.strip()
+]
+URL_BLACKLIST_PATTERN = (
+    re.compile("|".join(re.escape(kw) for kw in URL_BLACKLIST_KEYWORDS))
+    if URL_BLACKLIST_KEYWORDS else None
+)
+# 关键词较多且安装pyahocorasick时，使用自动机单次扫描URL（关键词少时正则已足够快）
+BLACKLIST_AUTOMATON_MIN_KEYWORDS = 6
+URL_BLACKLIST_MATCHER = None
+if ahocorasick is not None and len(URL_BLACKLIST_KEYWORDS) >= BLACKLIST_AUTOMATON_MIN_KEYWORDS:
+    URL_BLACKLIST_MATCHER = ahocorasick.Automaton()
+    for kw in URL_BLACKLIST_KEYWORDS:
+        URL_BLACKLIST_MATCHER.add_word(kw, kw)
+    URL_BLACKLIST_MATCHER.make_automaton()
+
 # Logo相关配置
 GITHUB_LOGO_BASE_URL = getattr(config, 'GITHUB_LOGO_BASE_URL', 
                               "https://raw.githubusercontent.com/fanmingming/live/main/tv")
 BACKUP_LOGO_BASE_URL = getattr(config, 'BACKUP_LOGO_BASE_URL',
                               "https://ghproxy.com/https://raw.githubusercontent.com/fanmingming/live/main/tv")
+# 使用git trees接口一次获取完整文件树（不受contents接口1000条上限影响，每项数据也更小）
 GITHUB_LOGO_API_URLS = getattr(config, 'GITHUB_LOGO_API_URLS', [
-    "https://api.github.com/repos/fanmingming/live/contents/main/tv",
-    "https://ghproxy.com/https://api.github.com/repos/fanmingming/live/contents/main/tv"
+    "https://api.github.com/repos/fanmingming/live/git/trees/main?recursive=1",
+    "https://ghproxy.com/https://api.github.com/repos/fanmingming/live/git/trees/main?recursive=1"
 ])
+GITHUB_LOGO_TREE_DIR = getattr(config, 'GITHUB_LOGO_TREE_DIR', "tv/")
+# GitHub logo列表本地缓存（跨进程复用，减少受限流的API请求）
+GITHUB_LOGO_CACHE_PATH = OUTPUT_FOLDER / "gh_logo_list.json"
+GITHUB_LOGO_CACHE_TTL = getattr(config, 'GITHUB_LOGO_CACHE_TTL', 6 * 3600)
+
+# 同步HTTP会话（复用连接池，供GitHub API等同步请求使用）
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=0))
+HTTP_SESSION.mount("http://", HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=0))
 
 # 日志配置（整合版）
 LOG_FILE_PATH = OUTPUT_FOLDER / "iptv_processor.log"
@@ -88,7 +184,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # ===================== 数据结构（整合优化版） =====================
-@dataclass
+@dataclass(slots=True)
 class SpeedTestResult:
     """测速结果数据类"""
     url: str
@@ -97,29 +193,64 @@ class SpeedTestResult:
     success: bool = False  # 是否成功
     error: Optional[str] = None  # 错误信息
 
-@dataclass
-class ChannelMeta:
-    """频道元信息（整合版：保留原始+标准化字段）"""
-    # 核心标识
-    url: str  # 播放URL（主键）
-    source_url: str = ""  # 来源URL
-    
-    # 原始元信息（完整保留）
-    raw_extinf: str = ""
-    tvg_id: Optional[str] = None
-    tvg_name: Optional[str] = None
-    tvg_logo: Optional[str] = None
-    original_group_title: Optional[str] = None  # 原始分类名
-    original_channel_name: Optional[str] = None  # 原始频道名
-    
-    # 标准化元信息（整合第一个代码的标准化逻辑）
-    clean_channel_name: str = ""  # 标准化频道名
-    standard_group_title: str = ""  # 标准化分类名
+@dataclass(slots=True)
+class AnnouncementEntry:
+    """公告条目（由config.announcements预先规范化）"""
+    name: str
+    url: str
+    logo: str = ""
+
+@dataclass(slots=True)
+class AnnouncementGroup:
+    """公告分组（仅保留有名称的分组和有URL的条目）"""
+    channel: str
+    entries: List[AnnouncementEntry]
 
 # 全局缓存（整合版）
-channel_meta_cache: Dict[str, ChannelMeta] = {}  # url -> ChannelMeta
+# 频道元信息按字段分列存储（后续只读取频道名和logo，不为每个URL创建元信息对象）
+channel_name_cache: Dict[str, str] = {}  # url -> 标准化频道名
+channel_logo_cache: Dict[str, str] = {}  # url -> tvg-logo（仅保存非空）
+channel_logo_index: Dict[str, str] = {}  # 标准化频道名 -> 缓存顺序中首个带logo的url
+channel_logo_index_dirty = False
 url_source_mapping: Dict[str, str] = {}  # url -> 来源URL
 
+def cache_channel_info(url: str, clean_name: str, tvg_logo: Optional[str]):
+    """缓存频道名和logo（同一URL后写入的覆盖先写入的），增量维护频道名->logo索引"""
+    global channel_logo_index_dirty
+    old_name = channel_name_cache.get(url)
+    channel_name_cache[url] = clean_name
+    if tvg_logo:
+        channel_logo_cache[url] = tvg_logo
+    else:
+        channel_logo_cache.pop(url, None)
+    
+    if channel_logo_index_dirty:
+        return
+    if old_name is None:
+        # 新URL位于缓存末尾，只在该频道名尚无logo时成为索引项
+        if tvg_logo:
+            channel_logo_index.setdefault(clean_name, url)
+    elif channel_logo_index.get(old_name) == url:
+        if old_name != clean_name or not tvg_logo:
+            channel_logo_index_dirty = True
+    elif tvg_logo:
+        if clean_name not in channel_logo_index:
+            channel_logo_index[clean_name] = url
+        else:
+            # 覆盖的URL可能位于当前索引项之前，下次查询时重建
+            channel_logo_index_dirty = True
+
+def get_channel_logo_index() -> Dict[str, str]:
+    """频道名->logo索引，URL覆盖导致顺序无法增量确定时单次遍历重建"""
+    global channel_logo_index_dirty
+    if channel_logo_index_dirty:
+        channel_logo_index.clear()
+        for url, clean_name in channel_name_cache.items():
+            if url in channel_logo_cache:
+                channel_logo_index.setdefault(clean_name, url)
+        channel_logo_index_dirty = False
+    return channel_logo_index
+
 # ===================== 核心标准化工具（整合第一个代码的核心逻辑） =====================
 def clean_group_title(group_title: str) -> str:
     """
@@ -140,13 +271,13 @@ def clean_group_title(group_title: str) -> str:
         # 1.1 精确匹配
         if hasattr(config, 'group_title_reverse_mapping') and original_title in config.group_title_reverse_mapping:
             result_title = config.group_title_reverse_mapping[original_title]
-            logger.debug(f"分类名精确映射：{original_title} → {result_title}")
+            logger.debug("分类名精确映射：%s → %s", original_title, result_title)
         else:
             # 1.2 模糊匹配（提取纯文字）
-            pure_text = ''.join(re.findall(r'[\u4e00-\u9fa5a-zA-Z0-9]+', original_title))
+            pure_text = ''.join(GROUP_PURE_TEXT_PATTERN.findall(original_title))
             if hasattr(config, 'group_title_reverse_mapping') and pure_text in config.group_title_reverse_mapping:
                 result_title = config.group_title_reverse_mapping[pure_text]
-                logger.debug(f"分类名模糊映射：{original_title} → {result_title}")
+                logger.debug("分类名模糊映射：%s → %s", original_title, result_title)
             else:
                 # 1.3 关键词匹配
                 if hasattr(config, 'group_title_mapping'):
@@ -154,7 +285,7 @@ def clean_group_title(group_title: str) -> str:
                         for original in originals:
                             if original in pure_text:
                                 result_title = target
-                                logger.debug(f"分类名关键词映射：{original_title} → {result_title}")
+                                logger.debug("分类名关键词映射：%s → %s", original_title, result_title)
                                 break
                         if result_title != original_title:
                             break
@@ -162,7 +293,7 @@ def clean_group_title(group_title: str) -> str:
         logger.debug(f"分类名映射匹配失败：{str(e)[:50]}，使用默认处理")
     
     # 步骤2：过滤特殊字符
-    cleaned = re.findall(r'[\u4e00-\u9fa5a-zA-Z0-9_\(\)]+', result_title)
+    cleaned = GROUP_KEEP_CHARS_PATTERN.findall(result_title)
     final_title = ''.join(cleaned).strip() or "未分类"
     
     # 步骤3：长度兜底
@@ -199,6 +330,7 @@ def standardize_cctv_name(channel_name: str) -> str:
     
     return channel_name
 
+@lru_cache(maxsize=None)
 def clean_channel_name(channel_name: str) -> str:
     """
     整合版：频道名标准化
@@ -213,7 +345,7 @@ def clean_channel_name(channel_name: str) -> str:
     channel_name = standardize_cctv_name(channel_name)
     
     # 步骤2：特殊频道名修复
-    channel_name = re.sub(r'CCTV-?5\+', 'CCTV5+', channel_name)
+    channel_name = CCTV5_PLUS_PATTERN.sub('CCTV5+', channel_name)
     channel_name = channel_name.replace("翡翠台", "TVB翡翠台")
     channel_name = channel_name.replace("凤凰中文", "凤凰卫视中文台")
     channel_name = channel_name.replace("凤凰资讯", "凤凰卫视资讯台")
@@ -222,99 +354,246 @@ def clean_channel_name(channel_name: str) -> str:
     channel_name = channel_name.replace("香港卫视", "香港卫视综合台")
     
     # 步骤3：正则分组修复
-    channel_name = re.sub(r'(\w+)二套(\w+)', r'\g<1>2套\g<2>', channel_name)
-    channel_name = re.sub(r'(\w+)三套(\w+)', r'\g<1>3套\g<2>', channel_name)
+    channel_name = SECOND_SET_PATTERN.sub(r'\g<1>2套\g<2>', channel_name)
+    channel_name = THIRD_SET_PATTERN.sub(r'\g<1>3套\g<2>', channel_name)
     
     # 步骤4：简化与过滤
-    channel_name = re.sub(r'经济生活', '经视', channel_name)
-    channel_name = re.sub(r'影视', '影视频道', channel_name)
-    channel_name = re.sub(r'文旅记录', '文旅', channel_name)
-    cleaned_name = re.sub(r'[$「」()（）\s-]', '', channel_name)
+    channel_name = channel_name.replace('经济生活', '经视')
+    channel_name = channel_name.replace('影视', '影视频道')
+    channel_name = channel_name.replace('文旅记录', '文旅')
+    cleaned_name = NAME_STRIP_PATTERN.sub('', channel_name)
     
-    # 步骤5：数字标准化
-    cleaned_name = re.sub(r'(\D*)(\d+)(\D*)', 
-                         lambda m: m.group(1) + str(int(m.group(2))) + m.group(3), 
-                         cleaned_name)
+    # 步骤5：数字标准化（去除前导零，如CCTV05 → CCTV5）
+    cleaned_name = DIGIT_RUN_PATTERN.sub(lambda m: str(int(m.group())), cleaned_name)
     
     return cleaned_name.upper()
 
 # ===================== 核心工具函数（整合优化版） =====================
+def build_category_matcher(rules: List[Tuple[str, List[str]]]):
+    """构建分类关键词自动机（未安装pyahocorasick时返回None，回退逐个匹配）"""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for priority, (category, keywords) in enumerate(rules):
+        for keyword in keywords:
+            # 同一关键词出现在多个分类时保留优先级最高的
+            if keyword not in automaton:
+                automaton.add_word(keyword, (priority, category))
+    automaton.make_automaton()
+    return automaton
+
+def classify_channel_group(channel_name: str, rules: List[Tuple[str, List[str]]], matcher=None) -> Optional[str]:
+    """按关键词推断频道分类，未命中返回None"""
+    if not channel_name:
+        return None
+    
+    if matcher is not None:
+        best = None
+        for _, (priority, category) in matcher.iter(channel_name):
+            if best is None or priority < best[0]:
+                best = (priority, category)
+                if priority == 0:
+                    break
+        return best[1] if best else None
+    
+    for category, keywords in rules:
+        if any(keyword in channel_name for keyword in keywords):
+            return category
+    return None
+
+TEXT_CATEGORY_MATCHER = build_category_matcher(TEXT_CATEGORY_RULES)
+URL_CATEGORY_MATCHER = build_category_matcher(URL_CATEGORY_RULES)
+
+IPV6_HOST_CHARS = frozenset("0123456789abcdefABCDEF:")
+
 def is_ipv6(url: str) -> bool:
-    """判断URL是否为IPv6地址"""
-    if not url:
+    """判断URL是否为IPv6地址（等价于匹配 ^http://[十六进制及冒号]，不使用正则）"""
+    if not url or not url.startswith("http://["):
+        return False
+    end = url.find("]", 8)
+    return end > 8 and IPV6_HOST_CHARS.issuperset(url[8:end])
+
+def is_blacklisted(url: str) -> bool:
+    """判断URL是否命中黑名单关键词（不区分大小写）"""
+    if URL_BLACKLIST_PATTERN is None or not url:
         return False
-    return re.match(r'^http:\/\/\[[0-9a-fA-F:]+\]', url) is not None
+    if URL_BLACKLIST_MATCHER is not None:
+        for _ in URL_BLACKLIST_MATCHER.iter(url.lower()):
+            return True
+        return False
+    return URL_BLACKLIST_PATTERN.search(url.lower()) is not None
+
+def get_url_host(url: str) -> str:
+    """提取URL主机部分（解析失败返回空字符串）"""
+    try:
+        return urlparse(url).netloc
+    except ValueError:
+        return ""
 
-def find_similar_name(target_name: str, name_list: List[str], cutoff: float = None) -> Optional[str]:
-    """模糊匹配最相似的频道名"""
+def fuzzy_match_name(target_name: str, name_list: List[str], min_cutoff: float) -> Optional[str]:
+    """模糊匹配单个名称（优先rapidfuzz，未安装时使用difflib）"""
+    if fuzz_process is not None:
+        match = fuzz_process.extractOne(target_name, name_list, scorer=fuzz.ratio, score_cutoff=min_cutoff * 100)
+        return match[0] if match else None
+    
+    matches = difflib.get_close_matches(target_name, name_list, n=1, cutoff=min_cutoff)
+    return matches[0] if matches else None
+
+def build_name_index(names: List[str]) -> Dict[str, str]:
+    """构建简化名索引（简化名 -> 原名），同一候选列表只需构建一次"""
+    return {NAME_SIMPLIFY_PATTERN.sub('', n): n for n in names}
+
+def find_similar_name(target_name: str, name_list: List[str], simplified_index: Dict[str, str] = None, cutoff: float = None) -> Optional[str]:
+    """模糊匹配最相似的频道名（simplified_index为build_name_index预先构建的索引）"""
     if not target_name or not name_list:
         return None
     
     cutoff = cutoff or getattr(config, 'MATCH_CUTOFF', CONFIG_DEFAULTS["MATCH_CUTOFF"])
-    name_set = set(name_list)
     
     # 精确匹配
-    if target_name in name_set:
+    if target_name in name_list:
         return target_name
     
     # 简化名匹配
-    simplified_target = re.sub(r'卫视|频道|综合|台', '', target_name)
-    simplified_names = {re.sub(r'卫视|频道|综合|台', '', n): n for n in name_list}
-    if simplified_target in simplified_names:
-        return simplified_names[simplified_target]
+    if simplified_index is None:
+        simplified_index = build_name_index(name_list)
+    simplified_target = NAME_SIMPLIFY_PATTERN.sub('', target_name)
+    if simplified_target in simplified_index:
+        return simplified_index[simplified_target]
+    
+    # 模糊匹配（阈值放宽0.1后取最相似者，等价于先按原阈值再按放宽阈值两轮匹配）
+    return fuzzy_match_name(target_name, name_list, max(cutoff - 0.1, 0.0))
+
+def prefilter_candidates(target_names: List[str], name_list: List[str], char_index: Dict[str, Set[int]]) -> List[str]:
+    """
+    候选名预筛选：与目标没有任何相同字符的名称相似度必为0，直接排除
+    （保持原列表顺序，不影响匹配结果）
+    """
+    candidate_indexes = set()
+    for name in target_names:
+        for char in set(name):
+            candidate_indexes.update(char_index.get(char, ()))
+    return [name_list[i] for i in sorted(candidate_indexes)]
+
+def batch_find_similar_names(target_names: List[str], name_list: List[str], simplified_index: Dict[str, str] = None, cutoff: float = None) -> List[Optional[str]]:
+    """
+    批量模糊匹配（结果与逐个调用find_similar_name一致）
+    1. 精确/简化名匹配
+    2. 按字符倒排索引预筛选候选名
+    3. 安装rapidfuzz+numpy时一次性计算得分矩阵，否则逐个模糊匹配
+    """
+    if not target_names:
+        return []
+    if not name_list:
+        return [None] * len(target_names)
     
-    # 模糊匹配
-    matches = difflib.get_close_matches(target_name, name_list, n=1, cutoff=cutoff)
-    if matches:
-        return matches[0]
+    cutoff = cutoff or getattr(config, 'MATCH_CUTOFF', CONFIG_DEFAULTS["MATCH_CUTOFF"])
+    min_cutoff = max(cutoff - 0.1, 0.0)
+    name_set = set(name_list)
+    if simplified_index is None:
+        simplified_index = build_name_index(name_list)
+    
+    # 精确/简化名匹配，剩余的进入模糊匹配
+    results: List[Optional[str]] = [None] * len(target_names)
+    fuzzy_indexes = []
+    for i, name in enumerate(target_names):
+        if not name:
+            continue
+        if name in name_set:
+            results[i] = name
+            continue
+        simplified_name = NAME_SIMPLIFY_PATTERN.sub('', name)
+        if simplified_name in simplified_index:
+            results[i] = simplified_index[simplified_name]
+        else:
+            fuzzy_indexes.append(i)
     
-    # 进一步降低阈值
-    matches = difflib.get_close_matches(target_name, name_list, n=1, cutoff=cutoff-0.1)
-    return matches[0] if matches else None
+    if not fuzzy_indexes:
+        return results
+    
+    # 阈值为0时任意候选都可能命中，不做预筛选
+    char_index = None
+    if min_cutoff > 0:
+        char_index = {}
+        for idx, name in enumerate(name_list):
+            for char in set(name):
+                char_index.setdefault(char, set()).add(idx)
+    
+    if fuzz_process is not None and numpy is not None:
+        fuzzy_targets = [target_names[i] for i in fuzzy_indexes]
+        candidates = prefilter_candidates(fuzzy_targets, name_list, char_index) if char_index is not None else name_list
+        if not candidates:
+            return results
+        scores = fuzz_process.cdist(
+            fuzzy_targets,
+            candidates,
+            scorer=fuzz.ratio,
+            score_cutoff=min_cutoff * 100,
+            workers=-1
+        )
+        # 保留浮点得分（取整会使接近的得分并列，argmax选错候选）；低于阈值的得分已置为0
+        score_cutoff = min_cutoff * 100
+        best_columns = scores.argmax(axis=1)
+        for row, i in enumerate(fuzzy_indexes):
+            column = best_columns[row]
+            if scores[row, column] >= score_cutoff:
+                results[i] = candidates[column]
+        return results
+    
+    for i in fuzzy_indexes:
+        target = target_names[i]
+        candidates = prefilter_candidates([target], name_list, char_index) if char_index is not None else name_list
+        if candidates:
+            results[i] = fuzzy_match_name(target, candidates, min_cutoff)
+    return results
 
 def sort_and_filter_urls(
     urls: List[str], 
     written_urls: set, 
     latency_results: Dict[str, SpeedTestResult], 
-    latency_threshold: float
-) -> List[str]:
-    """排序和过滤URL（整合版）"""
+    latency_threshold: float,
+    ipv6_map: Optional[Dict[str, bool]] = None
+) -> List[Tuple[str, Optional[float]]]:
+    """
+    排序和过滤URL（整合版）
+    返回(url, 延迟)列表，未提供测速结果时延迟为None
+    urls须已由调用方完成黑名单过滤，ipv6_map为预先计算的IP版本
+    """
     if not urls:
         return []
     
     filtered_urls = []
-    url_blacklist = [kw.lower().strip() for kw in getattr(config, 'URL_BLACKLIST', CONFIG_DEFAULTS["URL_BLACKLIST"]) if kw.strip()]
     
     for url in urls:
         url = url.strip()
         if not url or url in written_urls:
             continue
         
-        # 黑名单过滤
-        if url_blacklist and any(kw in url.lower() for kw in url_blacklist):
-            logger.debug(f"URL命中黑名单：{url[:60]}")
-            continue
-        
         # 延迟过滤
+        latency = None
         if latency_results:
             result = latency_results.get(url)
             if not result or not result.success or result.latency is None or result.latency > latency_threshold:
                 continue
+            latency = result.latency
         
-        filtered_urls.append(url)
+        filtered_urls.append((url, latency))
     
-    # 按IP版本排序
-    ip_priority = getattr(config, 'IP_VERSION_PRIORITY', CONFIG_DEFAULTS["IP_VERSION_PRIORITY"])
-    if ip_priority == "ipv6":
-        filtered_urls.sort(key=lambda u: is_ipv6(u), reverse=True)
+    # 单次排序：延迟优先，其次IP版本（与先按IP版本、再按延迟的两次稳定排序结果一致）
+    prefer_ipv6 = getattr(config, 'IP_VERSION_PRIORITY', CONFIG_DEFAULTS["IP_VERSION_PRIORITY"]) == "ipv6"
+    if ipv6_map:
+        url_is_ipv6 = lambda u: ipv6_map[u] if u in ipv6_map else is_ipv6(u)
     else:
-        filtered_urls.sort(key=lambda u: is_ipv6(u))
-    
-    # 按延迟排序
+        url_is_ipv6 = is_ipv6
     if latency_results:
-        filtered_urls.sort(key=lambda u: latency_results[u].latency if latency_results.get(u) else 9999)
+        sort_key = lambda item: (item[1], url_is_ipv6(item[0]) != prefer_ipv6)
+    else:
+        sort_key = lambda item: url_is_ipv6(item[0]) != prefer_ipv6
+    
+    filtered_urls.sort(key=sort_key)
     
-    written_urls.update(filtered_urls)
+    written_urls.update(url for url, _ in filtered_urls)
     return filtered_urls
 
 def add_url_suffix(url: str, index: int, total_urls: int, ip_version: str, latency: float) -> str:
@@ -330,28 +609,89 @@ def add_url_suffix(url: str, index: int, total_urls: int, ip_version: str, laten
         suffix = f"${ip_version}•线路{index}({latency_str})"
     return f"{base_url}{suffix}"
 
+def load_github_logo_cache() -> dict:
+    """读取GitHub logo列表本地缓存（格式：{"api_url", "etag", "files"}）"""
+    try:
+        with open(GITHUB_LOGO_CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if isinstance(cache, dict) and isinstance(cache.get("files"), list):
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_github_logo_cache(api_url: str, etag: str, logo_files: List[str]):
+    """保存GitHub logo列表本地缓存"""
+    try:
+        with open(GITHUB_LOGO_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"api_url": api_url, "etag": etag, "files": logo_files}, f, ensure_ascii=False)
+    except OSError as e:
+        logger.debug(f"保存GitHub logo列表缓存失败：{str(e)[:50]}")
+
+def parse_github_logo_listing(data) -> List[str]:
+    """解析GitHub API返回的logo文件名（兼容git trees接口和contents接口）"""
+    logo_files = []
+    if isinstance(data, dict):
+        # git trees接口：{"tree": [{"path": "tv/xxx.png", "type": "blob"}, ...]}
+        if data.get("truncated"):
+            logger.warning("GitHub文件树过大被截断，logo列表可能不完整")
+        for item in data.get("tree", []):
+            path = item.get("path", "")
+            if item.get("type") == "blob" and path.startswith(GITHUB_LOGO_TREE_DIR) and path.lower().endswith(".png"):
+                filename = path[len(GITHUB_LOGO_TREE_DIR):]
+                if "/" not in filename:
+                    logo_files.append(filename)
+    else:
+        # contents接口：[{"name": "xxx.png", "type": "file"}, ...]
+        for item in data:
+            if item.get("type") == "file" and item.get("name", "").lower().endswith(".png"):
+                logo_files.append(item["name"])
+    return logo_files
+
 @lru_cache(maxsize=1)
 def get_github_logo_list() -> List[str]:
-    """获取GitHub logo列表（增加异常保护）"""
-    headers = {"User-Agent": "Mozilla/5.0"}
+    """获取GitHub logo列表（增加异常保护，本地缓存有效期内不请求API）"""
+    cache = load_github_logo_cache()
+    cached_files = cache.get("files", [])
+    if cached_files:
+        try:
+            cache_age = time.time() - GITHUB_LOGO_CACHE_PATH.stat().st_mtime
+        except OSError:
+            cache_age = GITHUB_LOGO_CACHE_TTL
+        if cache_age < GITHUB_LOGO_CACHE_TTL:
+            logger.info(f"使用本地缓存的GitHub logo列表，共{len(cached_files)}个文件")
+            return cached_files
+    
     logo_files = []
     
     for api_url in GITHUB_LOGO_API_URLS:
+        headers = {}
+        # 携带ETag条件请求，未变化时返回304（不计入API限流）
+        if cached_files and cache.get("etag") and cache.get("api_url") == api_url:
+            headers["If-None-Match"] = cache["etag"]
         try:
-            response = requests.get(api_url, headers=headers, timeout=10, verify=False)
+            response = HTTP_SESSION.get(api_url, headers=headers, timeout=10, verify=False)
+            if response.status_code == 304:
+                logo_files = cached_files
+                GITHUB_LOGO_CACHE_PATH.touch()
+                logger.info(f"GitHub logo列表未变化，沿用本地缓存，共{len(logo_files)}个文件")
+                break
             response.raise_for_status()
-            data = response.json()
-            
-            for item in data:
-                if item.get("type") == "file" and item.get("name", "").lower().endswith(".png"):
-                    logo_files.append(item["name"])
+            logo_files = parse_github_logo_listing(response.json())
             
+            if logo_files:
+                save_github_logo_cache(api_url, response.headers.get("ETag", ""), logo_files)
             logger.info(f"成功获取GitHub logo列表，共{len(logo_files)}个文件")
             break
         except Exception as e:
             logger.warning(f"获取GitHub logo列表失败：{str(e)[:50]}")
             continue
     
+    # 请求失败时优先使用过期的本地缓存
+    if not logo_files and cached_files:
+        logger.info(f"使用过期的本地GitHub logo列表缓存，共{len(cached_files)}个文件")
+        logo_files = cached_files
+    
     # 兜底
     if not logo_files:
         logger.info("使用预设logo列表兜底")
@@ -365,6 +705,17 @@ def get_github_logo_list() -> List[str]:
     
     return logo_files
 
+@lru_cache(maxsize=1)
+def get_github_logo_set() -> frozenset:
+    """GitHub logo文件名集合（O(1)判断是否存在）"""
+    return frozenset(get_github_logo_list())
+
+@lru_cache(maxsize=1)
+def get_github_logo_name_index() -> Tuple[List[str], Dict[str, str]]:
+    """GitHub logo候选名及其简化名索引（随logo列表缓存，避免每个频道重复构建）"""
+    candidate_names = [f.replace(".png", "") for f in get_github_logo_list()]
+    return candidate_names, build_name_index(candidate_names)
+
 def get_channel_logo_url(channel_name: str) -> str:
     """生成logo URL（整合版，增加长度限制和异常保护）"""
     if not channel_name:
@@ -377,12 +728,17 @@ def get_channel_logo_url(channel_name: str) -> str:
     if len(clean_logo_name) > MAX_FILENAME_LENGTH:
         clean_logo_name = clean_logo_name[:MAX_FILENAME_LENGTH-3] + "..."
     
-    logo_filename = f"{clean_logo_name}.png"
+    # 优先使用M3U提取的logo（随提取过程变化，不缓存）
+    logo_url = get_channel_logo_index().get(clean_logo_name)
+    if logo_url:
+        return channel_logo_cache[logo_url]
     
-    # 优先使用M3U提取的logo
-    for meta in channel_meta_cache.values():
-        if meta.clean_channel_name == clean_logo_name and meta.tvg_logo:
-            return meta.tvg_logo
+    return resolve_fallback_logo_url(clean_logo_name)
+
+@lru_cache(maxsize=8192)
+def resolve_fallback_logo_url(clean_logo_name: str) -> str:
+    """按标准化频道名查找本地/GitHub logo（结果只取决于名称，按名称缓存，本地文件在程序运行期间视为不变）"""
+    logo_filename = f"{clean_logo_name}.png"
     
     # 本地logo
     try:
@@ -396,7 +752,7 @@ def get_channel_logo_url(channel_name: str) -> str:
     
     # GitHub logo
     try:
-        github_logo_files = get_github_logo_list()
+        github_logo_files = get_github_logo_set()
         if logo_filename in github_logo_files:
             return f"{BACKUP_LOGO_BASE_URL}/{logo_filename}"
     except Exception as e:
@@ -420,8 +776,8 @@ def get_channel_logo_url(channel_name: str) -> str:
     
     # 模糊匹配
     try:
-        candidate_names = [f.replace(".png", "") for f in github_logo_files]
-        similar_logo = find_similar_name(clean_logo_name, candidate_names, cutoff=0.5)
+        candidate_names, simplified_index = get_github_logo_name_index()
+        similar_logo = find_similar_name(clean_logo_name, candidate_names, simplified_index, cutoff=0.5)
         if similar_logo:
             return f"{BACKUP_LOGO_BASE_URL}/{similar_logo}.png"
     except Exception as e:
@@ -429,38 +785,81 @@ def get_channel_logo_url(channel_name: str) -> str:
     
     return ""
 
+def reset_caches():
+    """清空按名称缓存的标准化与logo查找结果"""
+    clean_channel_name.cache_clear()
+    resolve_fallback_logo_url.cache_clear()
+
 # ===================== 网络请求工具（整合版） =====================
-def replace_github_domain(url: str) -> List[str]:
-    """替换GitHub域名，提高访问成功率"""
+# 每个源最多尝试的候选链接数
+MAX_CANDIDATE_URLS = 5
+
+@lru_cache(maxsize=1024)
+def replace_github_domain(url: str) -> Tuple[str, ...]:
+    """替换GitHub域名，提高访问成功率（结果只取决于URL，按URL缓存）"""
     if not url or "github" not in url.lower():
-        return [url]
+        return (url,)
     
     candidate_urls = [url]
+    seen_urls = {url}
     
+    # 先找出URL中出现的镜像域名（通常只有一个），再逐个替换为其他镜像
+    present_mirrors = [original for original in GITHUB_MIRRORS if original in url]
     for mirror in GITHUB_MIRRORS:
-        for original in GITHUB_MIRRORS:
-            if original in url:
-                new_url = url.replace(original, mirror)
-                if new_url not in candidate_urls:
-                    candidate_urls.append(new_url)
+        for original in present_mirrors:
+            if original == mirror:
+                continue
+            new_url = url.replace(original, mirror)
+            if new_url not in seen_urls:
+                seen_urls.add(new_url)
+                candidate_urls.append(new_url)
     
+    # 镜像链接之后追加代理链接，凑满候选数即停止
     proxy_urls = []
+    remaining = MAX_CANDIDATE_URLS - len(candidate_urls)
     for base_url in candidate_urls:
+        if len(proxy_urls) >= remaining:
+            break
         for proxy in PROXY_PREFIXES:
             if not base_url.startswith(proxy):
                 proxy_url = proxy + base_url
-                if proxy_url not in proxy_urls:
+                if proxy_url not in seen_urls:
+                    seen_urls.add(proxy_url)
                     proxy_urls.append(proxy_url)
     
     candidate_urls.extend(proxy_urls)
-    unique_urls = list(dict.fromkeys(candidate_urls))
     
-    return unique_urls[:5]
+    return tuple(candidate_urls[:MAX_CANDIDATE_URLS])
+
+# 服务器常误报的宽松编码（可解码任意字节，优先按声明解码会把UTF-8内容变成乱码）
+LENIENT_CHARSETS = {"iso8859-1", "ascii"}
+
+def decode_response_body(body: bytes, charset: Optional[str] = None) -> str:
+    """
+    解码响应内容
+    声明了可信编码时优先使用；未声明或声明为latin-1/ascii时先尝试UTF-8、GB18030，最后才严格尝试声明的编码
+    """
+    declared_lenient = True
+    if charset:
+        try:
+            declared_lenient = codecs.lookup(charset).name in LENIENT_CHARSETS
+        except LookupError:
+            pass
+    if declared_lenient:
+        encodings = ("utf-8-sig", "gb18030", charset)
+    else:
+        encodings = (charset, "utf-8-sig", "gb18030")
+    for encoding in encodings:
+        if not encoding:
+            continue
+        try:
+            return body.decode(encoding).lstrip("\ufeff")
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return body.decode("utf-8", errors="replace")
 
-def fetch_url_with_retry(url: str, timeout: int = 15) -> Optional[str]:
+async def fetch_url_with_retry(session: aiohttp.ClientSession, url: str) -> Optional[str]:
     """带重试的URL抓取（自动修复GitHub URL）"""
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-    
     # 自动修复GitHub blob URL
     original_url = url
     if "github.com" in url and "/blob/" in url:
@@ -474,45 +873,36 @@ def fetch_url_with_retry(url: str, timeout: int = 15) -> Optional[str]:
         current_timeout = timeouts[min(idx, len(timeouts)-1)]
         try:
             logger.debug(f"尝试抓取 [{idx+1}/{len(candidate_urls)}]: {candidate} (超时：{current_timeout}s)")
-            response = requests.get(
+            async with session.get(
                 candidate,
-                headers=headers,
-                timeout=current_timeout,
-                verify=False,
+                timeout=aiohttp.ClientTimeout(total=current_timeout),
                 allow_redirects=True
-            )
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding or 'utf-8'
+            ) as response:
+                response.raise_for_status()
+                body = await response.read()
+                charset = response.charset
             logger.info(f"成功抓取：{candidate}")
-            return response.text
-        except requests.RequestException as e:
-            logger.warning(f"抓取失败 [{idx+1}/{len(candidate_urls)}]: {candidate} | {str(e)[:50]}")
+            return decode_response_body(body, charset)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"抓取失败 [{idx+1}/{len(candidate_urls)}]: {candidate} | {(str(e) or type(e).__name__)[:50]}")
             continue
     
     logger.error(f"所有候选链接都抓取失败：{original_url}")
     return None
 
 # ===================== M3U提取与解析（整合版） =====================
-def extract_m3u_meta(content: str, source_url: str) -> Tuple[OrderedDict, List[ChannelMeta]]:
+def extract_m3u_meta(content: str, source_url: str) -> OrderedDict:
     """
     提取M3U元信息（整合版）
-    1. 保留原始元信息
+    1. 解析logo与原始分类，缓存频道名和logo
     2. 自动标准化分类名和频道名
     """
-    m3u_pattern = re.compile(
-        r"(#EXTINF:-?\d+.*?)\n\s*([^#\n\r\s].*?)(?=\s|#|$)",
-        re.IGNORECASE | re.DOTALL | re.MULTILINE
-    )
-    attr_pattern = re.compile(r'(\w+)-(\w+)="([^"]*)"')
-    
     categorized_channels = OrderedDict()
-    meta_list = []
+    channel_count = 0
     seen_urls = set()
-    matches = m3u_pattern.findall(content)
     
-    for raw_extinf, url in matches:
-        url = url.strip()
-        raw_extinf = raw_extinf.strip()
+    for match in M3U_ENTRY_PATTERN.finditer(content):
+        raw_extinf, url = match.group(1).strip(), match.group(2).strip()
         
         if not url or not url.startswith(("http://", "https://")) or url in seen_urls:
             continue
@@ -520,26 +910,19 @@ def extract_m3u_meta(content: str, source_url: str) -> Tuple[OrderedDict, List[C
         seen_urls.add(url)
         url_source_mapping[url] = source_url
         
-        # 解析原始属性
-        tvg_id = None
-        tvg_name = None
+        # 解析原始属性（只保留后续用到的logo和分类）
         tvg_logo = None
         original_group_title = None
         original_channel_name = "未知频道"
         
-        attr_matches = attr_pattern.findall(raw_extinf)
-        for attr1, attr2, value in attr_matches:
-            if attr1 == "tvg" and attr2 == "id":
-                tvg_id = value
-            elif attr1 == "tvg" and attr2 == "name":
-                tvg_name = value
-            elif attr1 == "tvg" and attr2 == "logo":
+        for attr1, attr2, value in M3U_ATTR_PATTERN.findall(raw_extinf):
+            if attr1 == "tvg" and attr2 == "logo":
                 tvg_logo = value
             elif attr1 == "group" and attr2 == "title":
                 original_group_title = value
         
         # 提取原始频道名
-        name_match = re.search(r',\s*(.+?)\s*$', raw_extinf)
+        name_match = M3U_NAME_PATTERN.search(raw_extinf)
         if name_match:
             original_channel_name = name_match.group(1).strip()
         
@@ -547,30 +930,17 @@ def extract_m3u_meta(content: str, source_url: str) -> Tuple[OrderedDict, List[C
         standard_group_title = clean_group_title(original_group_title)
         clean_channel_name_val = clean_channel_name(original_channel_name)
         
-        # 创建元信息对象（整合版）
-        meta = ChannelMeta(
-            url=url,
-            source_url=source_url,
-            raw_extinf=raw_extinf,
-            tvg_id=tvg_id,
-            tvg_name=tvg_name,
-            tvg_logo=tvg_logo,
-            original_group_title=original_group_title,
-            original_channel_name=original_channel_name,
-            clean_channel_name=clean_channel_name_val,
-            standard_group_title=standard_group_title
-        )
-        
-        meta_list.append(meta)
-        channel_meta_cache[url] = meta
+        # 缓存元信息
+        cache_channel_info(url, clean_channel_name_val, tvg_logo)
+        channel_count += 1
         
         # 按标准化分类添加
         if standard_group_title not in categorized_channels:
             categorized_channels[standard_group_title] = []
         categorized_channels[standard_group_title].append((clean_channel_name_val, url))
     
-    logger.info(f"M3U提取完成：{len(meta_list)}个频道（已标准化分类）")
-    return categorized_channels, meta_list
+    logger.info(f"M3U提取完成：{channel_count}个频道（已标准化分类）")
+    return categorized_channels
 
 def extract_channels_from_content(content: str, source_url: str) -> OrderedDict:
     """
@@ -584,7 +954,7 @@ def extract_channels_from_content(content: str, source_url: str) -> OrderedDict:
     
     # 优先处理M3U格式
     if "#EXTM3U" in content:
-        m3u_categorized, _ = extract_m3u_meta(content, source_url)
+        m3u_categorized = extract_m3u_meta(content, source_url)
         categorized_channels = m3u_categorized
         for _, ch_list in m3u_categorized.items():
             for _, url in ch_list:
@@ -599,67 +969,41 @@ def extract_channels_from_content(content: str, source_url: str) -> OrderedDict:
             if not line or line.startswith(("//", "#", "/*", "*/")):
                 # 识别分类行
                 if any(keyword in line.lower() for keyword in ['#分类', '#genre', '分类:', 'genre:', '==', '---']):
-                    group_match = re.search(r'[：:=](\S+)', line)
+                    group_match = TEXT_GROUP_PATTERN.search(line)
                     if group_match:
                         current_group = group_match.group(1).strip()
                     else:
-                        current_group = re.sub(r'[#分类:genre:==\-—]', '', line).strip() or "默认分类"
+                        current_group = TEXT_GROUP_STRIP_PATTERN.sub('', line).strip() or "默认分类"
                     current_group = clean_group_title(current_group)  # 标准化分类名
                     logger.debug(f"识别并标准化分类：{current_group}")
                 continue
             
             # 匹配频道名,URL格式
-            pattern = r'([^,|#$]+)[,|#$]\s*(https?://[^\s,|#$]+)'
-            matches = re.findall(pattern, line, re.IGNORECASE)
-            if matches:
-                for name, url in matches:
-                    name = name.strip()
-                    url = url.strip()
-                    if not url or url in seen_urls:
-                        continue
-                    
-                    seen_urls.add(url)
-                    clean_name = clean_channel_name(name)
-                    
-                    # 智能分类推断 + 标准化
-                    group_title = clean_group_title(current_group)
-                    if any(keyword in clean_name for keyword in ['CCTV', '央视', '中央']):
-                        group_title = "央视频道"
-                    elif any(keyword in clean_name for keyword in ['卫视', '江苏', '浙江', '湖南', '东方']):
-                        group_title = "卫视频道"
-                    elif any(keyword in clean_name for keyword in ['电影', '影视']):
-                        group_title = "电影频道"
-                    elif any(keyword in clean_name for keyword in ['体育', 'CCTV5']):
-                        group_title = "体育频道"
-                    group_title = clean_group_title(group_title)  # 最终标准化
-                    
-                    # 生成元信息
-                    tvg_logo = get_channel_logo_url(clean_name)
-                    raw_extinf = f"#EXTINF:-1 tvg-id=\"\" tvg-name=\"{clean_name}\" tvg-logo=\"{tvg_logo}\" group-title=\"{group_title}\",{clean_name}"
-                    
-                    meta = ChannelMeta(
-                        url=url,
-                        source_url=source_url,
-                        raw_extinf=raw_extinf,
-                        tvg_id="",
-                        tvg_name=clean_name,
-                        tvg_logo=tvg_logo,
-                        original_group_title=current_group,
-                        original_channel_name=name,
-                        clean_channel_name=clean_name,
-                        standard_group_title=group_title
-                    )
-                    
-                    channel_meta_cache[url] = meta
-                    
-                    if group_title not in categorized_channels:
-                        categorized_channels[group_title] = []
-                    categorized_channels[group_title].append((clean_name, url))
-        
+            for match in TEXT_CHANNEL_PATTERN.finditer(line):
+                name, url = match.groups()
+                name = name.strip()
+                url = url.strip()
+                if not url or url in seen_urls:
+                    continue
+                
+                seen_urls.add(url)
+                clean_name = clean_channel_name(name)
+                
+                # 智能分类推断 + 标准化
+                group_title = clean_group_title(current_group)
+                group_title = classify_channel_group(clean_name, TEXT_CATEGORY_RULES, TEXT_CATEGORY_MATCHER) or group_title
+                group_title = clean_group_title(group_title)  # 最终标准化
+                
+                # 缓存元信息
+                cache_channel_info(url, clean_name, get_channel_logo_url(clean_name))
+                
+                if group_title not in categorized_channels:
+                    categorized_channels[group_title] = []
+                categorized_channels[group_title].append((clean_name, url))
+    
         # 处理单独的URL
-        pattern3 = r'(https?://[^\s]+)'
-        matches3 = re.findall(pattern3, content, re.IGNORECASE | re.MULTILINE)
-        for url in matches3:
+        for match in BARE_URL_PATTERN.finditer(content):
+            url = match.group(1)
             url = url.strip()
             if not url or url in seen_urls:
                 continue
@@ -673,27 +1017,9 @@ def extract_channels_from_content(content: str, source_url: str) -> OrderedDict:
                     break
             
             clean_name = clean_channel_name(channel_name)
-            group_title = clean_group_title("其他频道")
-            if any(keyword in clean_name for keyword in ['CCTV', '央视']):
-                group_title = "央视频道"
-            elif any(keyword in clean_name for keyword in ['卫视']):
-                group_title = "卫视频道"
-            
-            raw_extinf = f"#EXTINF:-1 tvg-id=\"\" tvg-name=\"{clean_name}\" tvg-logo=\"\" group-title=\"{group_title}\",{clean_name}"
-            meta = ChannelMeta(
-                url=url,
-                source_url=source_url,
-                raw_extinf=raw_extinf,
-                tvg_id="",
-                tvg_name=clean_name,
-                tvg_logo="",
-                original_group_title="其他频道",
-                original_channel_name=channel_name,
-                clean_channel_name=clean_name,
-                standard_group_title=group_title
-            )
+            group_title = classify_channel_group(clean_name, URL_CATEGORY_RULES, URL_CATEGORY_MATCHER) or clean_group_title("其他频道")
             
-            channel_meta_cache[url] = meta
+            cache_channel_info(url, clean_name, "")
             
             if group_title not in categorized_channels:
                 categorized_channels[group_title] = []
@@ -706,22 +1032,54 @@ def extract_channels_from_content(content: str, source_url: str) -> OrderedDict:
     return categorized_channels
 
 # ===================== 异步测速模块（保留增强版核心） =====================
+def interleave_by_host(urls: List[str]) -> List[str]:
+    """按主机轮转重排URL（同一主机内保持原顺序）"""
+    host_groups: Dict[str, List[str]] = {}
+    for url in urls:
+        host_groups.setdefault(get_url_host(url), []).append(url)
+    
+    interleaved = []
+    for round_urls in zip_longest(*host_groups.values()):
+        interleaved.extend(url for url in round_urls if url is not None)
+    return interleaved
+
 class SpeedTester:
     """异步测速器（整合版）"""
+    # 仅请求播放列表前1KB，用于解析分辨率
+    RANGE_HEADERS = {"Range": "bytes=0-1023"}
+    # 进度日志最小输出间隔（秒）
+    PROGRESS_MIN_SECONDS = 1.0
+    
     def __init__(self):
         self.session = None
+        self.resolver = None
         self.concurrent_limit = getattr(config, 'CONCURRENT_LIMIT', CONFIG_DEFAULTS["CONCURRENT_LIMIT"])
+        self.per_host_limit = getattr(config, 'PER_HOST_LIMIT', CONFIG_DEFAULTS["PER_HOST_LIMIT"])
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
         self.timeout = getattr(config, 'TIMEOUT', CONFIG_DEFAULTS["TIMEOUT"])
         self.retry_times = getattr(config, 'RETRY_TIMES', CONFIG_DEFAULTS["RETRY_TIMES"])
         self.progress_interval = getattr(config, 'PROGRESS_INTERVAL', CONFIG_DEFAULTS["PROGRESS_INTERVAL"])
         self.processed_count = 0
         self.total_count = 0
         self.start_time = None
+        self.last_progress_time = float("-inf")
     
     async def __aenter__(self):
         """创建异步会话"""
-        timeout = aiohttp.ClientTimeout(total=self.timeout)
-        connector = aiohttp.TCPConnector(limit=self.concurrent_limit, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout, sock_connect=min(5, self.timeout))
+        # 安装aiodns时使用异步DNS解析器，整个会话共用一个实例
+        if aiodns is not None:
+            self.resolver = aiohttp.AsyncResolver()
+        # 复用长连接：同一主机的多个URL共享TCP/TLS连接，避免重复握手
+        connector = aiohttp.TCPConnector(
+            resolver=self.resolver,
+            limit=self.concurrent_limit,
+            limit_per_host=self.per_host_limit,
+            keepalive_timeout=75,
+            force_close=False,
+            use_dns_cache=True,
+            ttl_dns_cache=600  # 大批量测速可能持续数分钟，DNS缓存覆盖整个测速过程
+        )
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36"
         }
@@ -736,12 +1094,19 @@ class SpeedTester:
         """关闭会话"""
         if self.session:
             await self.session.close()
+        if self.resolver:
+            await self.resolver.close()
     
     def _update_progress(self):
-        """更新测速进度"""
+        """更新测速进度（按数量间隔输出，且两次输出至少间隔PROGRESS_MIN_SECONDS）"""
         self.processed_count += 1
-        if self.processed_count % self.progress_interval == 0 or self.processed_count == self.total_count:
-            elapsed = time.time() - self.start_time
+        finished = self.processed_count == self.total_count
+        if finished or self.processed_count % self.progress_interval == 0:
+            now = time.perf_counter()
+            if not finished and now - self.last_progress_time < self.PROGRESS_MIN_SECONDS:
+                return
+            self.last_progress_time = now
+            elapsed = now - self.start_time
             speed = self.processed_count / elapsed if elapsed > 0 else 0
             remaining = (self.total_count - self.processed_count) / speed if speed > 0 else 0
             logger.info(
@@ -750,36 +1115,89 @@ class SpeedTester:
                 f"速度：{speed:.1f} URL/s | 剩余：{remaining:.0f}s"
             )
     
+    async def _read_resolution(self, url: str, response: aiohttp.ClientResponse) -> str:
+        """从HLS播放列表头部解析分辨率"""
+        try:
+            content = await response.content.read(1024)
+            res_match = RESOLUTION_PATTERN.search(content)
+            if res_match:
+                return res_match.group(1).decode()
+        except Exception as e:
+            logger.debug("解析%.60s分辨率失败：%.30s", url, e)
+        return "unknown"
+    
+    async def _probe(self, url: str) -> Tuple[int, float, str, Optional[str]]:
+        """单次探测：返回(状态码, 延迟ms, Content-Type, 分辨率)，HEAD返回非2xx/3xx时回退到小范围GET"""
+        resolution = None
+        start_time = time.perf_counter()
+        async with self.session.head(url, allow_redirects=True) as response:
+            latency = (time.perf_counter() - start_time) * 1000
+            status = response.status
+            content_type = response.headers.get("Content-Type", "").lower()
+        
+        # 不少直播服务器（udpxy转发、签名/CDN链接、部分nginx配置）拒绝HEAD并返回400/403/404等，
+        # 只要HEAD不是2xx/3xx就回退到小范围GET，以GET结果为准
+        if not 200 <= status < 400:
+            start_time = time.perf_counter()
+            async with self.session.get(url, headers=self.RANGE_HEADERS) as response:
+                latency = (time.perf_counter() - start_time) * 1000
+                status = response.status
+                content_type = response.headers.get("Content-Type", "").lower()
+                if status in (200, 206) and "mpegurl" in content_type:
+                    resolution = await self._read_resolution(url, response)
+        
+        return status, latency, content_type, resolution
+    
+    async def _fetch_resolution(self, url: str) -> str:
+        """小范围GET读取HLS播放列表解析分辨率"""
+        async with self.session.get(url, headers=self.RANGE_HEADERS) as response:
+            return await self._read_resolution(url, response)
+    
     async def measure_latency(self, url: str) -> SpeedTestResult:
-        """测量单个URL延迟"""
+        """测量单个URL延迟（同一主机限制并发，等待主机名额的时间不计入测速超时）"""
+        if self.per_host_limit > 0:
+            host = get_url_host(url)
+            semaphore = self.host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = self.host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+            async with semaphore:
+                result = await self._measure_latency(url)
+        else:
+            result = await self._measure_latency(url)
+        
+        self._update_progress()
+        if not result.success:
+            logger.debug("最终失败 %.60s | 原因: %s", url, result.error)
+        
+        return result
+    
+    async def _measure_latency(self, url: str) -> SpeedTestResult:
+        """测量单个URL延迟（优先HEAD探测，仅HLS额外读取1KB解析分辨率，每次尝试严格限时）"""
         result = SpeedTestResult(url=url)
         
         for attempt in range(self.retry_times + 1):
             try:
-                start_time = time.time()
-                async with self.session.get(url) as response:
-                    latency = (time.time() - start_time) * 1000
+                attempt_start = time.perf_counter()
+                status, latency, content_type, resolution = await asyncio.wait_for(
+                    self._probe(url), timeout=self.timeout
+                )
+                
+                if status in (200, 206):
+                    # 解析分辨率（仅使用本次尝试剩余的时间，超时不影响测速结果）
+                    if resolution is None and "mpegurl" in content_type:
+                        remaining = self.timeout - (time.perf_counter() - attempt_start)
+                        try:
+                            resolution = await asyncio.wait_for(self._fetch_resolution(url), timeout=max(remaining, 0.1))
+                        except Exception as e:
+                            logger.debug("解析%.60s分辨率失败：%.30s", url, e)
                     
-                    if response.status == 200:
-                        # 解析分辨率
-                        resolution = "unknown"
-                        content_type = response.headers.get("Content-Type", "")
-                        if "application/vnd.apple.mpegurl" in content_type:
-                            try:
-                                content = await response.content.read(1024)
-                                res_match = re.search(rb"RESOLUTION=(\d+x\d+)", content)
-                                if res_match:
-                                    resolution = res_match.group(1).decode()
-                            except Exception as e:
-                                logger.debug(f"解析{url[:60]}分辨率失败：{str(e)[:30]}")
-                        
-                        result.latency = latency
-                        result.resolution = resolution
-                        result.success = True
-                        logger.debug(f"[{attempt+1}] {url[:60]} 成功 | 延迟: {latency:.2f}ms")
-                        break
-                    else:
-                        result.error = f"HTTP状态码: {response.status}"
+                    result.latency = latency
+                    result.resolution = resolution or "unknown"
+                    result.success = True
+                    logger.debug("[%d] %.60s 成功 | 延迟: %.2fms", attempt + 1, url, latency)
+                    break
+                else:
+                    result.error = f"HTTP状态码: {status}"
             except asyncio.TimeoutError:
                 result.error = "请求超时"
             except aiohttp.ClientConnectionError:
@@ -790,18 +1208,16 @@ class SpeedTester:
             if attempt < self.retry_times:
                 await asyncio.sleep(0.5)
         
-        self._update_progress()
-        if not result.success:
-            logger.debug(f"最终失败 {url[:60]} | 原因: {result.error}")
-        
         return result
     
     async def batch_speed_test(self, urls: List[str]) -> Dict[str, SpeedTestResult]:
-        """批量测速"""
+        """批量测速（重复URL只测一次）"""
         results = {}
+        urls = list(dict.fromkeys(url for url in urls if url))
         self.total_count = len(urls)
         self.processed_count = 0
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
+        self.last_progress_time = float("-inf")
         
         if self.total_count == 0:
             logger.info("无URL需要测速")
@@ -809,20 +1225,27 @@ class SpeedTester:
         
         logger.info(f"开始批量测速：共{self.total_count}个URL | 并发数：{self.concurrent_limit} | 超时：{self.timeout}s")
         
-        semaphore = asyncio.Semaphore(self.concurrent_limit)
+        # 固定数量的worker从队列取URL，避免为每个URL预先创建协程
+        # 按主机轮转排列，避免所有worker同时等待同一主机的并发名额
+        url_queue = asyncio.Queue()
+        for url in interleave_by_host(urls):
+            url_queue.put_nowait(url)
         
-        async def worker(url):
-            async with semaphore:
-                result = await self.measure_latency(url)
-                results[url] = result
+        async def worker():
+            while True:
+                try:
+                    url = url_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[url] = await self.measure_latency(url)
         
-        tasks = [worker(url) for url in urls if url.strip()]
-        await asyncio.gather(*tasks)
+        worker_count = min(self.concurrent_limit, url_queue.qsize())
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
         
         # 统计结果
         success_count = sum(1 for r in results.values() if r.success)
         avg_latency = sum(r.latency for r in results.values() if r.success and r.latency) / success_count if success_count > 0 else 0
-        elapsed = time.time() - self.start_time
+        elapsed = time.perf_counter() - self.start_time
         
         logger.info(
             f"测速完成：成功{success_count}/{self.total_count} "
@@ -840,17 +1263,19 @@ def parse_template(template_file: str) -> OrderedDict:
 
     try:
         with open(template_file, "r", encoding="utf-8") as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                
-                if "#genre#" in line:
-                    current_category = line.split(",")[0].strip()
-                    template_channels[current_category] = []
-                elif current_category:
-                    channel_name = line.split(",")[0].strip()
-                    template_channels[current_category].append(channel_name)
+            text = f.read()
+        
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line[0] == "#":
+                continue
+            
+            head = line.partition(",")[0].strip()
+            if "#genre#" in line:
+                current_category = head
+                template_channels[current_category] = []
+            elif current_category:
+                template_channels[current_category].append(head)
     except FileNotFoundError:
         logger.error(f"模板文件不存在：{template_file}，请创建后再运行")
         return OrderedDict()
@@ -863,21 +1288,15 @@ def parse_template(template_file: str) -> OrderedDict:
 
 def merge_channels(target: OrderedDict, source: OrderedDict):
     """合并频道（去重+保留标准化分类）"""
-    url_set = set()
-    
     # 收集已有的URL
-    for category_name, ch_list in target.items():
-        for _, url in ch_list:
-            url_set.add(url)
+    url_set = {url for ch_list in target.values() for _, url in ch_list}
     
     # 合并源数据
     for category_name, channel_list in source.items():
-        if category_name not in target:
-            target[category_name] = []
-        
+        bucket = target.setdefault(category_name, [])
         for name, url in channel_list:
             if url not in url_set:
-                target[category_name].append((name, url))
+                bucket.append((name, url))
                 url_set.add(url)
 
 def match_channels(template_channels: OrderedDict, all_channels: OrderedDict) -> OrderedDict:
@@ -885,43 +1304,52 @@ def match_channels(template_channels: OrderedDict, all_channels: OrderedDict) ->
     matched_channels = OrderedDict()
     unmatched_channels = []
     
-    # 构建映射
-    name_to_urls = {}
-    all_online_names = set()
-    all_clean_names = set()
+    # 构建映射：原始名与标准化名共用同一URL列表，一次字典查找即可命中
+    name_to_urls = defaultdict(list)
     
-    for _, channel_list in all_channels.items():
+    for channel_list in all_channels.values():
         for name, url in channel_list:
             if name:
                 clean_name = clean_channel_name(name)
-                all_online_names.add(name)
-                all_clean_names.add(clean_name)
-                name_to_urls.setdefault(name, []).append(url)
-                name_to_urls.setdefault(clean_name, []).append(url)
+                name_to_urls[name].append(url)
+                if clean_name != name:
+                    name_to_urls[clean_name].append(url)
+    
+    candidate_names = list(name_to_urls)
+    simplified_index = build_name_index(candidate_names)
+    
+    # 模板频道名 -> 标准化名（每个模板名只标准化一次）
+    template_clean_names = {
+        channel_name: clean_channel_name(channel_name)
+        for template_names in template_channels.values()
+        for channel_name in template_names
+    }
     
-    all_online_names_list = list(all_online_names)
-    all_clean_names_list = list(all_clean_names)
+    # 精确匹配未命中的模板频道，统一批量模糊匹配
+    fuzzy_targets = list(OrderedDict.fromkeys(
+        clean_name
+        for channel_name, clean_name in template_clean_names.items()
+        if channel_name not in name_to_urls and clean_name not in name_to_urls
+    ))
+    fuzzy_matches = dict(zip(fuzzy_targets, batch_find_similar_names(fuzzy_targets, candidate_names, simplified_index)))
     
     # 匹配
     for category, template_names in template_channels.items():
         matched_channels[category] = OrderedDict()
         for channel_name in template_names:
-            clean_template_name = clean_channel_name(channel_name)
-            matched_name = None
+            clean_template_name = template_clean_names[channel_name]
             
-            # 多轮匹配（优先使用标准化名称）
-            if channel_name in all_online_names:
+            # 精确匹配（原始名/标准化名），未命中时使用模糊匹配结果
+            if channel_name in name_to_urls:
                 matched_name = channel_name
-            elif clean_template_name in all_clean_names:
+            elif clean_template_name in name_to_urls:
                 matched_name = clean_template_name
             else:
-                matched_name = find_similar_name(channel_name, all_online_names_list)
-            if not matched_name:
-                matched_name = find_similar_name(clean_template_name, all_clean_names_list)
+                matched_name = fuzzy_matches.get(clean_template_name)
             
             if matched_name and matched_name in name_to_urls:
                 matched_channels[category][channel_name] = name_to_urls[matched_name]
-                logger.debug(f"匹配成功：{channel_name} → {matched_name}")
+                logger.debug("匹配成功：%s → %s", channel_name, matched_name)
             else:
                 unmatched_channels.append(channel_name)
                 logger.warning(f"未匹配到频道：{channel_name}")
@@ -939,7 +1367,47 @@ def match_channels(template_channels: OrderedDict, all_channels: OrderedDict) ->
     
     return matched_channels
 
-def filter_source_urls(template_file: str) -> Tuple[OrderedDict, OrderedDict]:
+async def iter_source_contents(source_urls: List[str]):
+    """
+    并发抓取所有源（共用一个aiohttp会话，滑动窗口限制并发数）
+    按配置顺序逐个产出(源URL, 内容或异常)，前面的源就绪即可处理，无需等待全部下载完成
+    正在下载与已下载待处理的源合计不超过FETCH_CONCURRENT_LIMIT个，前面的源较慢时不会无限积压后续内容
+    """
+    fetch_limit = max(1, getattr(config, 'FETCH_CONCURRENT_LIMIT', CONFIG_DEFAULTS["FETCH_CONCURRENT_LIMIT"]))
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+    connector = aiohttp.TCPConnector(ssl=False, ttl_dns_cache=300)
+    
+    async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+        async def fetch(url):
+            logger.info(f"开始抓取源：{url}")
+            return await fetch_url_with_retry(session, url)
+        
+        pending_urls = iter(source_urls)
+        window = deque()
+        
+        def start_next():
+            url = next(pending_urls, None)
+            if url is not None:
+                window.append((url, asyncio.ensure_future(fetch(url))))
+        
+        for _ in range(fetch_limit):
+            start_next()
+        try:
+            while window:
+                url, task = window[0]
+                try:
+                    content = await task
+                except Exception as e:
+                    content = e
+                window.popleft()
+                # 队首取出后立即补充下一个源，解析当前内容时下载继续进行
+                start_next()
+                yield url, content
+        finally:
+            for _, task in window:
+                task.cancel()
+
+async def filter_source_urls(template_file: str) -> Tuple[OrderedDict, OrderedDict]:
     """抓取并过滤源URL（整合版，已移除基础版文件生成调用）"""
     template_channels = parse_template(template_file)
     if not template_channels:
@@ -955,16 +1423,19 @@ def filter_source_urls(template_file: str) -> Tuple[OrderedDict, OrderedDict]:
     failed_urls = []
     total_extracted = 0
     
-    for url in source_urls:
-        logger.info(f"\n开始抓取源：{url}")
+    # 并发抓取，按配置顺序依次解析合并（保证结果稳定），解析完即释放源内容
+    async for url, content in iter_source_contents(source_urls):
+        logger.info(f"\n开始处理源：{url}")
         fetched_channels = OrderedDict()
         
-        try:
-            content = fetch_url_with_retry(url)
-            if content is not None:
-                fetched_channels = extract_channels_from_content(content, url)
-        except Exception as e:
-            logger.error(f"处理 {url} 时异常：{str(e)}", exc_info=True)
+        if isinstance(content, Exception):
+            logger.error(f"抓取 {url} 时异常：{str(content)}", exc_info=content)
+        elif content is not None:
+            try:
+                # 在工作线程中解析，事件循环继续推进其余源的下载
+                fetched_channels = await asyncio.to_thread(extract_channels_from_content, content, url)
+            except Exception as e:
+                logger.error(f"处理 {url} 时异常：{str(e)}", exc_info=True)
         
         fetched_count = sum(len(ch_list) for _, ch_list in fetched_channels.items())
         
@@ -995,105 +1466,254 @@ def filter_source_urls(template_file: str) -> Tuple[OrderedDict, OrderedDict]:
     
     return matched_channels, template_channels
 
-def write_to_files(f_m3u, f_txt, category, channel_name, index, url, ip_version, latency):
-    """写入文件（整合版）"""
-    if not url:
+# EXTINF属性模板（tvg-id之后的部分），频道线路与公告共用
+EXTINF_ATTRS_FORMAT = ' tvg-name="{name}" tvg-logo="{logo}" group-title="{group}",{title}\n'
+
+def build_extinf_suffix(category: str, channel_name: str) -> str:
+    """生成频道级EXTINF公共部分（同一频道的多条线路仅tvg-id不同）"""
+    logo_url = get_channel_logo_url(channel_name)
+    return EXTINF_ATTRS_FORMAT.format(name=channel_name, logo=logo_url, group=category, title=channel_name)
+
+def write_to_files(m3u_parts, txt_parts, channel_name, urls, extinf_suffix):
+    """写入输出缓冲（整合版，一次写入同一频道的全部线路，tvg-id为线路序号）"""
+    if not urls:
         return
     
-    try:
-        meta = channel_meta_cache.get(url)
-        logo_url = meta.tvg_logo if (meta and meta.tvg_logo) else get_channel_logo_url(channel_name)
-        tvg_id = meta.tvg_id if (meta and meta.tvg_id) else str(index)
-        tvg_name = meta.clean_channel_name if (meta and meta.clean_channel_name) else channel_name
-        group_title = meta.standard_group_title if (meta and meta.standard_group_title) else category
-        
-        # 写入M3U
-        f_m3u.write(
-            f"#EXTINF:-1 tvg-id=\"{tvg_id}\" tvg-name=\"{tvg_name}\" "
-            f"tvg-logo=\"{logo_url}\" group-title=\"{group_title}\",{channel_name}\n"
-        )
-        f_m3u.write(url + "\n")
-        # 写入TXT
-        f_txt.write(f"{channel_name},{url}\n")
-    except Exception as e:
-        logger.warning(f"写入文件失败（频道：{channel_name}）：{str(e)[:50]}")
+    # 写入M3U（EXTINF行与URL行合并为一条记录）
+    m3u_parts.extend(
+        f"#EXTINF:-1 tvg-id=\"{index}\"{extinf_suffix}{url}\n"
+        for index, url in enumerate(urls, start=1)
+    )
+    # 写入TXT
+    txt_parts.extend(f"{channel_name},{url}\n" for url in urls)
 
-def generate_speed_report(latency_results: Dict[str, SpeedTestResult], latency_threshold: float):
-    """生成测速报告（整合版）"""
+# 测速报告固定文本（模块加载时一次编码为UTF-8字节，报告以二进制写入）
+REPORT_BUFFER_SIZE = 1024 * 1024
+REPORT_TITLE_BYTES = "IPTV直播源测速报告（整合版）\n".encode("utf-8")
+REPORT_RULE_BYTES = ("=" * 80 + "\n").encode("utf-8")
+REPORT_DASH_BYTES = ("-" * 80 + "\n").encode("utf-8")
+REPORT_VALID_HEADER_BYTES = (
+    "【有效URL列表（按延迟升序）】\n"
+    f"{'排名':<4} {'延迟(ms)':<10} {'分辨率':<10} {'IP版本':<8} {'URL'}\n"
+).encode("utf-8")
+REPORT_VALID_EMPTY_BYTES = "【有效URL列表】\n无有效URL\n".encode("utf-8")
+REPORT_FAILED_HEADER_BYTES = (
+    "\n【失败URL列表】\n"
+    f"{'排名':<4} {'失败原因':<15} {'URL'}\n"
+).encode("utf-8")
+REPORT_FAILED_EMPTY_BYTES = "\n【失败URL列表】\n无失败URL\n".encode("utf-8")
+
+def generate_speed_report(
+    latency_results: Dict[str, SpeedTestResult],
+    latency_threshold: float,
+    ipv6_map: Dict[str, bool] = None,
+    generated_at: datetime = None
+):
+    """生成测速报告（整合版，ipv6_map为预先计算的URL -> 是否IPv6，generated_at为本次生成时间）"""
     report_path = OUTPUT_FOLDER / "speed_test_report.txt"
+    if ipv6_map is None:
+        ipv6_map = {url: is_ipv6(url) for url in latency_results}
+    if generated_at is None:
+        generated_at = datetime.now()
     
     total_urls = len(latency_results)
-    success_urls = [r for r in latency_results.values() if r.success]
-    valid_urls = [r for r in success_urls if r.latency and r.latency <= latency_threshold]
-    ipv4_urls = [r for r in valid_urls if not is_ipv6(r.url)]
-    ipv6_urls = [r for r in valid_urls if is_ipv6(r.url)]
     
-    valid_urls.sort(key=lambda x: x.latency)
+    # 单次遍历完成分组与延迟统计
+    success_urls = []
+    valid_urls = []
+    ipv4_urls = []
+    ipv6_urls = []
+    failed_urls = []
+    latency_sum = 0.0
+    min_latency = float("inf")
+    max_latency = 0.0
+    for r in latency_results.values():
+        if not r.success:
+            failed_urls.append(r)
+            continue
+        success_urls.append(r)
+        if r.latency and r.latency <= latency_threshold:
+            valid_urls.append(r)
+            latency_sum += r.latency
+            if r.latency < min_latency:
+                min_latency = r.latency
+            if r.latency > max_latency:
+                max_latency = r.latency
+            (ipv6_urls if ipv6_map[r.url] else ipv4_urls).append(r)
+    
+    valid_urls.sort(key=attrgetter('latency'))
     
     try:
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write("IPTV直播源测速报告（整合版）\n")
-            f.write("="*80 + "\n")
-            f.write(f"测试时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"延迟阈值：{latency_threshold}ms | 并发数：{getattr(config, 'CONCURRENT_LIMIT', 20)}\n")
+        with open(report_path, "wb", buffering=REPORT_BUFFER_SIZE) as f:
+            f.write(REPORT_TITLE_BYTES)
+            f.write(REPORT_RULE_BYTES)
+            
+            # 统计摘要（动态文本先拼接后整体编码一次）
+            summary_lines = [
+                f"测试时间：{generated_at.strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"延迟阈值：{latency_threshold}ms | 并发数：{getattr(config, 'CONCURRENT_LIMIT', 20)}\n",
+            ]
             
             # 黑名单信息
             url_blacklist = getattr(config, 'URL_BLACKLIST', CONFIG_DEFAULTS["URL_BLACKLIST"])
             if url_blacklist:
-                f.write(f"URL黑名单关键词：{', '.join(url_blacklist)}\n")
+                summary_lines.append(f"URL黑名单关键词：{', '.join(url_blacklist)}\n")
             
-            f.write(f"总测试URL数：{total_urls}\n")
+            summary_lines.append(f"总测试URL数：{total_urls}\n")
             success_rate = f"{len(success_urls)/total_urls*100:.1f}%" if total_urls > 0 else "0.0%"
-            f.write(f"测试成功数：{len(success_urls)} ({success_rate})\n")
+            summary_lines.append(f"测试成功数：{len(success_urls)} ({success_rate})\n")
             valid_rate = f"{len(valid_urls)/len(success_urls)*100:.1f}%" if len(success_urls) > 0 else "0.0%"
-            f.write(f"有效URL数（延迟<{latency_threshold}ms）：{len(valid_urls)} ({valid_rate})\n")
-            f.write(f"  - IPv4有效URL：{len(ipv4_urls)}\n")
-            f.write(f"  - IPv6有效URL：{len(ipv6_urls)}\n")
+            summary_lines.append(f"有效URL数（延迟<{latency_threshold}ms）：{len(valid_urls)} ({valid_rate})\n")
+            summary_lines.append(f"  - IPv4有效URL：{len(ipv4_urls)}\n")
+            summary_lines.append(f"  - IPv6有效URL：{len(ipv6_urls)}\n")
             
             if valid_urls:
-                avg_latency = sum(r.latency for r in valid_urls) / len(valid_urls)
-                min_latency = min(r.latency for r in valid_urls)
-                max_latency = max(r.latency for r in valid_urls)
-                f.write(f"有效URL延迟统计：平均{avg_latency:.2f}ms | 最小{min_latency:.2f}ms | 最大{max_latency:.2f}ms\n")
+                avg_latency = latency_sum / len(valid_urls)
+                summary_lines.append(f"有效URL延迟统计：平均{avg_latency:.2f}ms | 最小{min_latency:.2f}ms | 最大{max_latency:.2f}ms\n")
             
-            f.write("="*80 + "\n\n")
+            f.write("".join(summary_lines).encode("utf-8"))
+            f.write(REPORT_RULE_BYTES)
+            f.write(b"\n")
             
             # 有效URL列表
             if valid_urls:
-                f.write("【有效URL列表（按延迟升序）】\n")
-                f.write(f"{'排名':<4} {'延迟(ms)':<10} {'分辨率':<10} {'IP版本':<8} {'URL'}\n")
-                f.write("-"*80 + "\n")
-                for idx, result in enumerate(valid_urls, 1):
-                    ip_version = "IPv6" if is_ipv6(result.url) else "IPv4"
-                    f.write(f"{idx:<4} {result.latency:<10.2f} {result.resolution:<10} {ip_version:<8} {result.url[:100]}\n")
+                f.write(REPORT_VALID_HEADER_BYTES)
+                f.write(REPORT_DASH_BYTES)
+                # 逐行流式写入，不构造整表字符串
+                f.writelines(
+                    f"{idx:<4} {result.latency:<10.2f} {result.resolution:<10} {'IPv6' if ipv6_map[result.url] else 'IPv4':<8} {result.url[:100]}\n".encode("utf-8")
+                    for idx, result in enumerate(valid_urls, 1)
+                )
             else:
-                f.write("【有效URL列表】\n无有效URL\n")
+                f.write(REPORT_VALID_EMPTY_BYTES)
             
             # 失败URL列表
-            failed_urls = [r for r in latency_results.values() if not r.success]
             if failed_urls:
-                f.write("\n【失败URL列表】\n")
-                f.write(f"{'排名':<4} {'失败原因':<15} {'URL'}\n")
-                f.write("-"*80 + "\n")
-                for idx, result in enumerate(failed_urls[:50], 1):
-                    f.write(f"{idx:<4} {result.error:<15} {result.url[:100]}\n")
+                f.write(REPORT_FAILED_HEADER_BYTES)
+                f.write(REPORT_DASH_BYTES)
+                f.writelines(
+                    f"{idx:<4} {result.error:<15} {result.url[:100]}\n".encode("utf-8")
+                    for idx, result in enumerate(failed_urls[:50], 1)
+                )
                 if len(failed_urls) > 50:
-                    f.write(f"... 共{len(failed_urls)}个失败URL，仅显示前50个\n")
+                    f.write(f"... 共{len(failed_urls)}个失败URL，仅显示前50个\n".encode("utf-8"))
             else:
-                f.write("\n【失败URL列表】\n无失败URL\n")
+                f.write(REPORT_FAILED_EMPTY_BYTES)
         
         logger.info(f"测速报告已生成：{report_path}")
     except Exception as e:
         logger.error(f"生成测速报告失败：{str(e)}", exc_info=True)
 
-def updateChannelUrlsM3U(channels, template_channels, latency_results: Dict[str, SpeedTestResult]):
-    """生成最终优化版文件（整合版）"""
+def normalize_announcements(announcements: list, default_name: str = None) -> List[AnnouncementGroup]:
+    """
+    将公告配置（字典列表）一次性规范化为数据类列表
+    default_name为未配置名称的公告条目使用的名称（默认当天日期）；无名称的分组与无URL的条目直接丢弃
+    """
+    if default_name is None:
+        default_name = datetime.now().strftime("%Y-%m-%d")
+    groups = []
+    for group in announcements:
+        channel_name = group.get('channel', '')
+        if not channel_name:
+            continue
+        entries = [
+            AnnouncementEntry(
+                name=entry.get('name', default_name),
+                url=entry.get('url', ''),
+                logo=entry.get('logo', '')
+            )
+            for entry in group.get('entries', [])
+            if entry.get('url', '')
+        ]
+        groups.append(AnnouncementGroup(channel=channel_name, entries=entries))
+    return groups
+
+def build_announcement_sections(
+    announcements: List[AnnouncementGroup],
+    latency_results: Dict[str, SpeedTestResult],
+    latency_threshold: float,
+    ipv6_map: Dict[str, bool],
+    written_urls_ipv4: set,
+    written_urls_ipv6: set
+) -> Tuple[Dict[bool, Tuple[str, str]], int]:
+    """
+    生成公告频道内容（按IP版本分别拼接为整段M3U/TXT文本，announcements为规范化后的公告分组）
+    返回 ({是否IPv6: (m3u文本, txt文本)}, 黑名单过滤数)
+    """
+    parts = {
+        False: ([], [], written_urls_ipv4),
+        True: ([], [], written_urls_ipv6)
+    }
+    blacklist_filtered = 0
+    announcement_id = 1
+    for group in announcements:
+        channel_name = group.channel
+        parts[False][1].append(f"{channel_name},#genre#\n")
+        parts[True][1].append(f"{channel_name},#genre#\n")
+        
+        for entry in group.entries:
+            entry_name = entry.name
+            entry_url = entry.url
+            entry_logo = entry.logo
+            
+            # 已写入的公告URL直接跳过（不再重复黑名单与测速结果判断）
+            if entry_url in written_urls_ipv4 or entry_url in written_urls_ipv6:
+                continue
+            
+            # 黑名单过滤
+            if is_blacklisted(entry_url):
+                logger.debug("公告URL命中黑名单：%.60s", entry_url)
+                blacklist_filtered += 1
+                continue
+            
+            entry_result = latency_results.get(entry_url)
+            if not (entry_result and entry_result.success and entry_result.latency and entry_result.latency <= latency_threshold):
+                continue
+            
+            # 登记到对应IP版本的已写入集合，频道循环中的相同URL会被自然跳过
+            m3u_parts, txt_parts, written_urls = parts[ipv6_map[entry_url]]
+            written_urls.add(entry_url)
+            entry_attrs = EXTINF_ATTRS_FORMAT.format(
+                name=entry_name,
+                logo=entry_logo,
+                group=channel_name,
+                title=f"{entry_name}({entry_result.latency:.0f}ms)"
+            )
+            m3u_parts.append(f"#EXTINF:-1 tvg-id=\"{announcement_id}\"{entry_attrs}{entry_url}\n")
+            txt_parts.append(f"{entry_name},{entry_url}\n")
+            announcement_id += 1
+    
+    sections = {
+        is_v6: ("".join(m3u_parts), "".join(txt_parts))
+        for is_v6, (m3u_parts, txt_parts, _) in parts.items()
+    }
+    return sections, blacklist_filtered
+
+def write_output_files(outputs):
+    """将各输出缓冲写入文件（outputs为(文件路径, 文本片段列表)序列；整体编码一次，二进制写入绕过文本层，换行统一为\n）"""
+    for file_path, parts in outputs:
+        with open(file_path, "wb") as f:
+            f.write("".join(parts).encode("utf-8"))
+        # 写完即释放缓冲
+        parts.clear()
+
+async def updateChannelUrlsM3U(
+    channels,
+    template_channels,
+    latency_results: Dict[str, SpeedTestResult],
+    ipv6_map: Dict[str, bool] = None
+):
+    """生成最终优化版文件（整合版，ipv6_map为预先计算的URL -> 是否IPv6）"""
     latency_threshold = getattr(config, 'LATENCY_THRESHOLD', CONFIG_DEFAULTS["LATENCY_THRESHOLD"])
     written_urls_ipv4 = set()
     written_urls_ipv6 = set()
     
+    # 每个URL只判断一次IP版本，公告、频道和测速报告共用
+    if ipv6_map is None:
+        ipv6_map = {url: is_ipv6(url) for url in latency_results}
+    
     # URL黑名单
-    url_blacklist_keywords = [kw.lower().strip() for kw in getattr(config, 'URL_BLACKLIST', CONFIG_DEFAULTS["URL_BLACKLIST"]) if kw.strip()]
+    url_blacklist_keywords = URL_BLACKLIST_KEYWORDS
     total_blacklist_filtered = 0
 
     # 文件路径
@@ -1106,164 +1726,152 @@ def updateChannelUrlsM3U(channels, template_channels, latency_results: Dict[str,
     epg_urls = getattr(config, 'epg_urls', CONFIG_DEFAULTS["EPG_URLS"])
     announcements = getattr(config, 'announcements', CONFIG_DEFAULTS["ANNOUNCEMENTS"])
 
+    # 输出缓冲（先在内存中拼接，最后每个文件只写一次）
+    m3u_ipv4_parts = []
+    txt_ipv4_parts = []
+    m3u_ipv6_parts = []
+    txt_ipv6_parts = []
+
+    # 本次生成时间（头部、公告默认名称、测速报告共用）
+    generated_at = datetime.now()
+
     try:
-        with open(ipv4_m3u_path, "w", encoding="utf-8", buffering=1024*1024) as f_m3u_ipv4, \
-             open(ipv4_txt_path, "w", encoding="utf-8", buffering=1024*1024) as f_txt_ipv4, \
-             open(ipv6_m3u_path, "w", encoding="utf-8", buffering=1024*1024) as f_m3u_ipv6, \
-             open(ipv6_txt_path, "w", encoding="utf-8", buffering=1024*1024) as f_txt_ipv6:
-
-            # 写入头部
-            epg_str = ",".join(f'"{url}"' for url in epg_urls) if epg_urls else ""
-            header_note = f"# 延迟阈值：{latency_threshold}ms | 生成时间：{time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-            if url_blacklist_keywords:
-                header_note += f"# URL黑名单过滤关键词：{', '.join(url_blacklist_keywords)}\n"
+        # 写入头部
+        epg_str = ",".join(f'"{url}"' for url in epg_urls) if epg_urls else ""
+        header_note = f"# 延迟阈值：{latency_threshold}ms | 生成时间：{generated_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        if url_blacklist_keywords:
+            header_note += f"# URL黑名单过滤关键词：{', '.join(url_blacklist_keywords)}\n"
+        
+        m3u_ipv4_parts.append(f"#EXTM3U x-tvg-url={epg_str}\n{header_note}")
+        m3u_ipv6_parts.append(f"#EXTM3U x-tvg-url={epg_str}\n{header_note}")
+
+        # 写入公告频道（预先拼接为整段文本）
+        announcement_groups = normalize_announcements(announcements, default_name=generated_at.strftime("%Y-%m-%d"))
+        announcement_sections, total_blacklist_filtered = build_announcement_sections(
+            announcement_groups, latency_results, latency_threshold, ipv6_map, written_urls_ipv4, written_urls_ipv6
+        )
+        m3u_ipv4_parts.append(announcement_sections[False][0])
+        txt_ipv4_parts.append(announcement_sections[False][1])
+        m3u_ipv6_parts.append(announcement_sections[True][0])
+        txt_ipv6_parts.append(announcement_sections[True][1])
+
+        # 写入模板频道（热点循环中使用局部引用）
+        ipv4_written = 0
+        ipv6_written = 0
+        url_suffix = add_url_suffix
+        check_ipv6 = is_ipv6
+        check_blacklisted = is_blacklisted
+        sort_filter = sort_and_filter_urls
+        write_channel = write_to_files
+        build_suffix = build_extinf_suffix
+        log_debug = logger.debug
+        
+        for category, channel_list in template_channels.items():
+            if not category or category not in channels:
+                continue
+            
+            txt_ipv4_parts.append(f"{category},#genre#\n")
+            txt_ipv6_parts.append(f"{category},#genre#\n")
             
-            f_m3u_ipv4.write(f"#EXTM3U x-tvg-url={epg_str}\n{header_note}")
-            f_m3u_ipv6.write(f"#EXTM3U x-tvg-url={epg_str}\n{header_note}")
-
-            # 写入公告频道
-            announcement_id = 1
-            for group in announcements:
-                channel_name = group.get('channel', '')
-                if not channel_name:
+            for channel_name in channel_list:
+                if channel_name not in channels[category]:
                     continue
                 
-                f_txt_ipv4.write(f"{channel_name},#genre#\n")
-                f_txt_ipv6.write(f"{channel_name},#genre#\n")
+                raw_urls = channels[category][channel_name]
                 
-                for entry in group.get('entries', []):
-                    entry_name = entry.get('name', datetime.now().strftime("%Y-%m-%d"))
-                    entry_url = entry.get('url', '')
-                    entry_logo = entry.get('logo', '')
-                    
-                    if not entry_url:
-                        continue
-                    
-                    # 黑名单过滤
-                    if url_blacklist_keywords and any(kw in entry_url.lower() for kw in url_blacklist_keywords):
-                        logger.debug(f"公告URL命中黑名单：{entry_url[:60]}")
+                # 黑名单过滤 + 分离IP版本（单次遍历）
+                ipv4_urls_filtered = []
+                ipv6_urls_filtered = []
+                for url in raw_urls:
+                    url_is_ipv6 = ipv6_map[url] if url in ipv6_map else check_ipv6(url)
+                    if check_blacklisted(url):
+                        log_debug("%s URL命中黑名单：%.60s", "IPv6" if url_is_ipv6 else "IPv4", url)
                         total_blacklist_filtered += 1
                         continue
-                    
-                    entry_result = latency_results.get(entry_url)
-                    if entry_result and entry_result.success and entry_result.latency and entry_result.latency <= latency_threshold:
-                        if is_ipv6(entry_url):
-                            if entry_url not in written_urls_ipv6:
-                                written_urls_ipv6.add(entry_url)
-                                f_m3u_ipv6.write(
-                                    f"#EXTINF:-1 tvg-id=\"{announcement_id}\" tvg-name=\"{entry_name}\" "
-                                    f"tvg-logo=\"{entry_logo}\" group-title=\"{channel_name}\",{entry_name}({entry_result.latency:.0f}ms)\n"
-                                )
-                                f_m3u_ipv6.write(f"{entry_url}\n")
-                                f_txt_ipv6.write(f"{entry_name},{entry_url}\n")
-                                announcement_id += 1
-                        else:
-                            if entry_url not in written_urls_ipv4:
-                                written_urls_ipv4.add(entry_url)
-                                f_m3u_ipv4.write(
-                                    f"#EXTINF:-1 tvg-id=\"{announcement_id}\" tvg-name=\"{entry_name}\" "
-                                    f"tvg-logo=\"{entry_logo}\" group-title=\"{channel_name}\",{entry_name}({entry_result.latency:.0f}ms)\n"
-                                )
-                                f_m3u_ipv4.write(f"{entry_url}\n")
-                                f_txt_ipv4.write(f"{entry_name},{entry_url}\n")
-                                announcement_id += 1
-
-            # 写入模板频道
-            ipv4_written = 0
-            ipv6_written = 0
-            
-            for category, channel_list in template_channels.items():
-                if not category or category not in channels:
-                    continue
+                    (ipv6_urls_filtered if url_is_ipv6 else ipv4_urls_filtered).append(url)
                 
-                f_txt_ipv4.write(f"{category},#genre#\n")
-                f_txt_ipv6.write(f"{category},#genre#\n")
+                # 排序过滤
+                ipv4_urls = sort_filter(
+                    ipv4_urls_filtered,
+                    written_urls_ipv4,
+                    latency_results,
+                    latency_threshold,
+                    ipv6_map=ipv6_map
+                )
+                ipv6_urls = sort_filter(
+                    ipv6_urls_filtered,
+                    written_urls_ipv6,
+                    latency_results,
+                    latency_threshold,
+                    ipv6_map=ipv6_map
+                )
                 
-                for channel_name in channel_list:
-                    if channel_name not in channels[category]:
-                        continue
-                    
-                    raw_urls = channels[category][channel_name]
-                    
-                    # 分离IP版本
-                    ipv4_urls_raw = [u for u in raw_urls if not is_ipv6(u)]
-                    ipv6_urls_raw = [u for u in raw_urls if is_ipv6(u)]
-                    
-                    # 黑名单过滤
-                    ipv4_urls_filtered = []
-                    for url in ipv4_urls_raw:
-                        if url_blacklist_keywords and any(kw in url.lower() for kw in url_blacklist_keywords):
-                            logger.debug(f"IPv4 URL命中黑名单：{url[:60]}")
-                            total_blacklist_filtered += 1
-                            continue
-                        ipv4_urls_filtered.append(url)
-                    
-                    ipv6_urls_filtered = []
-                    for url in ipv6_urls_raw:
-                        if url_blacklist_keywords and any(kw in url.lower() for kw in url_blacklist_keywords):
-                            logger.debug(f"IPv6 URL命中黑名单：{url[:60]}")
-                            total_blacklist_filtered += 1
-                            continue
-                        ipv6_urls_filtered.append(url)
-                    
-                    # 排序过滤
-                    ipv4_urls = sort_and_filter_urls(
-                        ipv4_urls_filtered,
-                        written_urls_ipv4,
-                        latency_results,
-                        latency_threshold
-                    )
-                    ipv6_urls = sort_and_filter_urls(
-                        ipv6_urls_filtered,
-                        written_urls_ipv6,
-                        latency_results,
-                        latency_threshold
-                    )
+                if not ipv4_urls and not ipv6_urls:
+                    continue
+                
+                # 异常只影响当前频道（每个频道一次try，而非每条线路）
+                try:
+                    # 频道级公共字段只计算一次
+                    extinf_suffix = build_suffix(category, channel_name)
                     
                     # 写入IPv4
                     total_ipv4 = len(ipv4_urls)
-                    for idx, url in enumerate(ipv4_urls, start=1):
-                        latency = latency_results[url].latency
-                        new_url = add_url_suffix(url, idx, total_ipv4, "IPV4", latency)
-                        write_to_files(f_m3u_ipv4, f_txt_ipv4, category, channel_name, idx, new_url, "IPV4", latency)
-                        ipv4_written += 1
+                    write_channel(m3u_ipv4_parts, txt_ipv4_parts, channel_name, [
+                        url_suffix(url, idx, total_ipv4, "IPV4", latency)
+                        for idx, (url, latency) in enumerate(ipv4_urls, start=1)
+                    ], extinf_suffix)
+                    ipv4_written += total_ipv4
                     
                     # 写入IPv6
                     total_ipv6 = len(ipv6_urls)
-                    for idx, url in enumerate(ipv6_urls, start=1):
-                        latency = latency_results[url].latency
-                        new_url = add_url_suffix(url, idx, total_ipv6, "IPV6", latency)
-                        write_to_files(f_m3u_ipv6, f_txt_ipv6, category, channel_name, idx, new_url, "IPV6", latency)
-                        ipv6_written += 1
-
-            # 生成报告
-            generate_speed_report(latency_results, latency_threshold)
-            
-            # 黑名单统计
-            if url_blacklist_keywords:
-                logger.info(f"\nURL黑名单过滤统计：")
-                logger.info(f"  - 黑名单关键词：{', '.join(url_blacklist_keywords)}")
-                logger.info(f"  - 累计过滤URL数：{total_blacklist_filtered}")
-            
-            logger.info(f"\n最终文件生成完成：")
-            logger.info(f"  - IPv4 M3U: {ipv4_m3u_path} (写入{ipv4_written}个URL)")
-            logger.info(f"  - IPv4 TXT: {ipv4_txt_path}")
-            logger.info(f"  - IPv6 M3U: {ipv6_m3u_path} (写入{ipv6_written}个URL)")
-            logger.info(f"  - IPv6 TXT: {ipv6_txt_path}")
-            logger.info(f"  - 延迟阈值：{latency_threshold}ms")
-            
+                    write_channel(m3u_ipv6_parts, txt_ipv6_parts, channel_name, [
+                        url_suffix(url, idx, total_ipv6, "IPV6", latency)
+                        for idx, (url, latency) in enumerate(ipv6_urls, start=1)
+                    ], extinf_suffix)
+                    ipv6_written += total_ipv6
+                except Exception as e:
+                    logger.warning(f"写入文件失败（频道：{channel_name}）：{e}")
+
+        # 写入播放列表文件与生成测速报告互不依赖，放入线程池并行执行
+        await asyncio.gather(
+            asyncio.to_thread(write_output_files, (
+                (ipv4_m3u_path, m3u_ipv4_parts),
+                (ipv4_txt_path, txt_ipv4_parts),
+                (ipv6_m3u_path, m3u_ipv6_parts),
+                (ipv6_txt_path, txt_ipv6_parts)
+            )),
+            asyncio.to_thread(generate_speed_report, latency_results, latency_threshold, ipv6_map, generated_at)
+        )
+        
+        # 黑名单统计
+        if url_blacklist_keywords:
+            logger.info(f"\nURL黑名单过滤统计：")
+            logger.info(f"  - 黑名单关键词：{', '.join(url_blacklist_keywords)}")
+            logger.info(f"  - 累计过滤URL数：{total_blacklist_filtered}")
+        
+        logger.info(f"\n最终文件生成完成：")
+        logger.info(f"  - IPv4 M3U: {ipv4_m3u_path} (写入{ipv4_written}个URL)")
+        logger.info(f"  - IPv4 TXT: {ipv4_txt_path}")
+        logger.info(f"  - IPv6 M3U: {ipv6_m3u_path} (写入{ipv6_written}个URL)")
+        logger.info(f"  - IPv6 TXT: {ipv6_txt_path}")
+        logger.info(f"  - 延迟阈值：{latency_threshold}ms")
+        
     except Exception as e:
         logger.error(f"生成最终文件失败：{str(e)}", exc_info=True)
 
 # ===================== 主程序（整合版，已移除基础版文件相关说明） =====================
 async def main():
     """整合版主函数"""
-    start_total = time.time()
+    start_total = time.perf_counter()
     try:
         # 清空缓存
-        global channel_meta_cache, url_source_mapping
-        channel_meta_cache = {}
+        global channel_logo_index_dirty, url_source_mapping
+        channel_name_cache.clear()
+        channel_logo_cache.clear()
+        channel_logo_index.clear()
+        channel_logo_index_dirty = False
         url_source_mapping = {}
+        reset_caches()
         
         # 加载配置
         template_file = getattr(config, 'TEMPLATE_FILE', CONFIG_DEFAULTS["TEMPLATE_FILE"])
@@ -1277,24 +1885,31 @@ async def main():
         
         # 1. 抓取并提取频道
         logger.info("\n===== 1. 抓取并提取直播源频道 =====")
-        channels, template_channels = filter_source_urls(template_file)
+        channels, template_channels = await filter_source_urls(template_file)
         if not channels:
             logger.error("无匹配的频道数据，终止流程")
             return
         
-        # 2. 收集所有URL
-        all_urls = set()
+        # 2. 收集所有URL（字典去重并保留首次出现顺序，测速顺序由batch_speed_test按主机轮转决定）
+        all_urls = {}
         for category in channels.values():
             for urls in category.values():
-                all_urls.update(urls)
+                all_urls.update(dict.fromkeys(urls))
         for group in getattr(config, 'announcements', []):
             for entry in group.get('entries', []):
                 url = entry.get('url', '')
                 if url:
-                    all_urls.add(url)
+                    all_urls[url] = None
         
-        all_urls = list(all_urls)
+        # 过滤空URL和非HTTP(S) URL（同一URL只测速一次）
+        collected_count = len(all_urls)
+        all_urls = [url for url in all_urls if url and url.startswith(("http://", "https://"))]
         logger.info(f"\n===== 2. 批量测速（共{len(all_urls)}个URL） =====")
+        logger.info(f"去重后URL数：{collected_count} | 过滤无效URL后：{len(all_urls)}")
+        # 每个URL只判断一次IP版本，后续生成文件和测速报告共用
+        ipv6_map = {url: is_ipv6(url) for url in all_urls}
+        ipv6_count = sum(ipv6_map.values())
+        logger.info(f"其中IPv4：{len(all_urls) - ipv6_count} | IPv6：{ipv6_count}")
         
         # 3. 异步测速
         async with SpeedTester() as tester:
@@ -1302,10 +1917,10 @@ async def main():
         
         # 4. 生成最终文件
         logger.info("\n===== 3. 生成最终优化版文件 =====")
-        updateChannelUrlsM3U(channels, template_channels, latency_results)
+        await updateChannelUrlsM3U(channels, template_channels, latency_results, ipv6_map)
         
         # 统计耗时
-        total_elapsed = time.time() - start_total
+        total_elapsed = time.perf_counter() - start_total
         logger.info(f"\n===== 所有流程执行完成 | 总耗时：{total_elapsed:.1f}s =====")
         logger.info(f"\n文件说明：")
         logger.info(f"  - live_ipv4.m3u/live_ipv6.m3u: 优化版（测速筛选+IP分类+黑名单过滤）")
@@ -1316,9 +1931,29 @@ async def main():
         raise
 
 if __name__ == "__main__":
-    # Windows兼容
-    if os.name == "nt":
-        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    # 可选的高性能事件循环：Windows下winloop，POSIX下uvloop
+    fast_loop = None
+    try:
+        if os.name == "nt":
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        pass
     
-    # 运行主程序
-    asyncio.run(main())
+    if sys.version_info >= (3, 12):
+        # Python 3.12+通过loop_factory指定事件循环（install()已弃用）
+        if fast_loop is not None:
+            loop_factory = fast_loop.new_event_loop
+        elif os.name == "nt":
+            # Windows兼容：未安装winloop时使用Selector事件循环
+            loop_factory = asyncio.SelectorEventLoop
+        else:
+            loop_factory = None
+        asyncio.run(main(), loop_factory=loop_factory)
+    else:
+        if fast_loop is not None:
+            fast_loop.install()
+        elif os.name == "nt":
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        asyncio.run(main())